@@ -0,0 +1,557 @@
+import asyncio
+import mmap
+import os
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from enum import Enum
+from operator import attrgetter
+
+import httpx
+import orjson
+import simdjson
+
+# один парсер на модуль: simdjson переиспользует свой внутренний буфер,
+# поэтому распарсенный документ живёт только до следующего parse()
+_parser = simdjson.Parser()
+
+# файлы крупнее этого порога читаем через mmap + simdjson,
+# не копируя содержимое в память целиком
+_MMAP_THRESHOLD = 1 << 20  # 1 МБ
+
+
+class TaskStatus(str, Enum):
+    TODO = "todo"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+
+
+# конверсия строки в статус идёт на каждую строку в get_all,
+# а Enum.__call__ заметно дороже одного обращения к словарю
+_STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+
+
+class Task:
+    """Задача трекера: id, название, статус и заметки от LLM."""
+
+    # задачи создаются заново на каждый get_all: без __dict__
+    # экземпляр занимает в разы меньше памяти
+    __slots__ = ("id", "title", "status", "notes")
+
+    def __init__(self, id: int, title: str, status: TaskStatus = TaskStatus.TODO,
+                 notes: str | None = None):
+        title = title.strip()
+        if not title:
+            raise ValueError("Название задачи не может быть пустым")
+        if len(title) > 50:
+            raise ValueError("Название задачи не может быть длиннее 50 символов")
+        self.id = id
+        self.title = title
+        self.status = status
+        self.notes = notes
+
+    @classmethod
+    def from_raw(cls, item) -> "Task":
+        """Создать задачу из сырой json-записи (dict или simdjson-объект)."""
+        return cls(int(item["id"]), item["title"],
+                   _STATUS_BY_VALUE[item["status"]],
+                   item["notes"] if "notes" in item else None)
+
+    def rename_title(self, new_title: str) -> None:
+        new_title = new_title.strip()
+        if not new_title:
+            raise ValueError("Название задачи не может быть пустым")
+        if len(new_title) > 50:
+            raise ValueError("Название задачи не может быть длиннее 50 символов")
+        self.title = new_title
+
+    def change_status(self, new_status: TaskStatus) -> None:
+        # на пути из API статус уже проверен pydantic-ом; проверка
+        # остаётся для внешних вызовов и стоит один поиск в словаре.
+        # Ключи-члены совпадают по хешу со своими значениями, поэтому
+        # строка "todo" находит член и self.status всегда TaskStatus
+        status = _STATUS_BY_VALUE.get(new_status)
+        if status is None:
+            raise ValueError("Недопустимый статус задачи")
+        self.status = status
+
+    def add_notes(self, notes: str) -> None:
+        self.notes = notes
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "status": self.status.value,
+            "notes": self.notes,
+        }
+
+
+class TaskNotFoundError(ValueError):
+    """Запрошенной задачи нет в хранилище.
+
+    Отдельный тип, чтобы API отличал «нет такой задачи» (404)
+    от ошибок валидации полей (422).
+    """
+
+
+class TaskStore:
+    """Хранение задач в оперативной памяти (урок 2)."""
+
+    def __init__(self):
+        self.tasks: dict[int, Task] = {}
+        self._next_id = 1
+
+    def get_all(self) -> list[Task]:
+        return list(self.tasks.values())
+
+    def create_task(self, title: str) -> Task:
+        task = Task(self._next_id, title)
+        self.tasks[task.id] = task
+        self._next_id += 1
+        return task
+
+    def update_task(self, id: int, title: str | None = None,
+                    status: TaskStatus | None = None) -> Task:
+        if id not in self.tasks:
+            raise TaskNotFoundError("Задача не найдена")
+        # мутируем копию и кладём её в словарь только после всех проверок,
+        # чтобы упавшая валидация не оставила задачу обновлённой наполовину
+        old = self.tasks[id]
+        task = Task(old.id, old.title, old.status, old.notes)
+        if title is not None:
+            task.rename_title(title)
+        if status is not None:
+            task.change_status(status)
+        self.tasks[id] = task
+        return task
+
+    def delete_task(self, id: int) -> None:
+        if id not in self.tasks:
+            raise TaskNotFoundError("Задача не найдена")
+        del self.tasks[id]
+
+
+class FileTaskStore:
+    """Хранение задач в json-файле проекта.
+
+    fsync=True даёт полную долговечность записи (fsync файла и каталога)
+    ценой скорости; autoflush=False копит мутации в памяти до commit(),
+    чтобы серия правок стоила одну запись на диск.
+    """
+
+    def __init__(self, path: str = "tasks.json", fsync: bool = False,
+                 autoflush: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self.autoflush = autoflush
+        # кеш разобранного файла: валиден, пока не поменялся mtime
+        self._cache: list[Task] | None = None
+        self._cache_mtime: int = -1
+        self._dirty = False
+        if not os.path.exists(self.path):
+            self.dump_all([])
+
+    def get_all(self) -> list[Task]:
+        if self._dirty:
+            # несброшенные мутации: файл отстаёт от состояния в памяти
+            return list(self._cache)
+        st = os.stat(self.path)
+        if self._cache is not None and st.st_mtime_ns == self._cache_mtime:
+            return list(self._cache)
+        # файл уже отсортирован по id при записи в dump_all
+        if st.st_size > _MMAP_THRESHOLD:
+            with open(self.path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                payload = _parser.parse(mm)
+                result = [Task.from_raw(item) for item in payload["tasks"]]
+                # документ ссылается на буфер mmap —
+                # освобождаем его до закрытия отображения
+                del payload
+        else:
+            with open(self.path, "rb") as f:
+                payload = orjson.loads(f.read())
+            result = [Task.from_raw(item) for item in payload["tasks"]]
+        self._cache = result
+        self._cache_mtime = st.st_mtime_ns
+        return list(result)
+
+    def dump_all(self, tasks: list[Task]) -> None:
+        # порядок по id поддерживаем на записи, чтобы не сортировать
+        # на каждом чтении
+        tasks.sort(key=attrgetter("id"))
+        payload = {"schema_version": 1,
+                   "tasks": [task.to_dict() for task in tasks]}
+        # пишем во временный файл и атомарно подменяем основной
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(
+                payload,
+                option=(orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_APPEND_NEWLINE),
+            ))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if self.fsync:
+            # фиксируем и запись в каталоге, иначе rename может пропасть
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)),
+                             os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        # только что записанный список и есть актуальное состояние файла —
+        # обновляем кеш, чтобы следующий get_all не перечитывал файл
+        self._cache = list(tasks)
+        self._cache_mtime = os.stat(self.path).st_mtime_ns
+        self._dirty = False
+
+    def _save(self, tasks: list[Task]) -> None:
+        if self.autoflush:
+            self.dump_all(tasks)
+        else:
+            tasks.sort(key=attrgetter("id"))
+            self._cache = list(tasks)
+            self._dirty = True
+
+    def commit(self) -> None:
+        """Записать накопленные при autoflush=False мутации одним разом."""
+        if self._dirty:
+            self.dump_all(list(self._cache))
+
+    def create_task(self, title: str) -> Task:
+        tasks = self.get_all()
+        next_id = max((task.id for task in tasks), default=0) + 1
+        task = Task(next_id, title)
+        tasks.append(task)
+        self._save(tasks)
+        return task
+
+    def update_task(self, id: int, title: str | None = None,
+                    status: TaskStatus | None = None,
+                    notes: str | None = None) -> Task:
+        tasks = self.get_all()
+        idx = {task.id: i for i, task in enumerate(tasks)}
+        i = idx.get(id)
+        if i is None:
+            raise TaskNotFoundError("Задача не найдена")
+        # get_all отдаёт те же Task-объекты, что лежат в кеше, поэтому
+        # мутируем копию и ставим её в список только после всех проверок:
+        # упавшая валидация не должна отравить кеш несохранённым состоянием
+        old = tasks[i]
+        task = Task(old.id, old.title, old.status, old.notes)
+        if title is not None:
+            task.rename_title(title)
+        if status is not None:
+            task.change_status(status)
+        if notes is not None:
+            task.add_notes(notes)
+        tasks[i] = task
+        self._save(tasks)
+        return task
+
+    def delete_task(self, id: int) -> None:
+        tasks = self.get_all()
+        idx = {task.id: i for i, task in enumerate(tasks)}
+        i = idx.get(id)
+        if i is None:
+            raise TaskNotFoundError("Задача не найдена")
+        tasks.pop(i)
+        self._save(tasks)
+
+
+class BaseHTTPClient(ABC):
+    """Базовый класс для HTTP-клиентов внешних сервисов (урок 4).
+
+    Все клиенты делят один httpx.AsyncClient: пул keep-alive соединений
+    с HTTP/2-мультиплексированием, так что один воркер обслуживает много
+    запросов одновременно, не занимая поток на время round-trip.
+    Клиент создаётся на старте приложения и закрывается на остановке.
+    """
+
+    _client: httpx.AsyncClient | None = None
+
+    # та же политика повторов, что была у requests-сессии:
+    # до трёх повторов с экспоненциальной паузой на временных ошибках
+    _RETRY_TOTAL = 3
+    _RETRY_BACKOFF = 0.2
+    _RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(self, base_url: str, timeout: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    @classmethod
+    def open_client(cls) -> None:
+        cls._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100,
+                                max_keepalive_connections=20),
+            timeout=10.0,
+            http2=True,
+            # httpx повторяет на этом уровне только ошибки соединения;
+            # повторы по кодам ответа делает request() ниже
+            transport=httpx.AsyncHTTPTransport(retries=cls._RETRY_TOTAL),
+        )
+
+    @classmethod
+    async def close_client(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @abstractmethod
+    def auth_headers(self) -> dict:
+        """Заголовки авторизации конкретного сервиса."""
+
+    async def request(self, method: str, path: str, expected: tuple = (200,),
+                      headers: dict | None = None, json=None,
+                      **kwargs) -> httpx.Response:
+        url = f"{self.base_url}{path}"
+        # клиент общий для всех сервисов, поэтому заголовки
+        # авторизации передаём на каждый запрос; без переопределений
+        # отдаём готовый dict, не собирая новый
+        auth = self.auth_headers()
+        merged = auth if headers is None else {**auth, **headers}
+        if json is not None:
+            # кодируем тело через orjson, минуя stdlib-сериализацию httpx
+            kwargs["content"] = orjson.dumps(json)
+            if "Content-Type" not in merged:
+                merged = {**merged, "Content-Type": "application/json"}
+        for attempt in range(self._RETRY_TOTAL + 1):
+            if attempt:
+                await asyncio.sleep(self._RETRY_BACKOFF * 2 ** (attempt - 1))
+            resp = await self._client.request(method, url, headers=merged,
+                                              timeout=self.timeout, **kwargs)
+            if (resp.status_code in expected
+                    or resp.status_code not in self._RETRY_STATUSES):
+                break
+        if resp.status_code not in expected:
+            raise RuntimeError(
+                f"{method} {url} вернул {resp.status_code}: {resp.text}")
+        return resp
+
+    @staticmethod
+    def json(resp: httpx.Response) -> dict:
+        # orjson разбирает байты ответа быстрее, чем stdlib-путь resp.json()
+        return orjson.loads(resp.content)
+
+
+class JsonBinClient(BaseHTTPClient):
+    """Клиент jsonbin.io: хранит весь список задач в одном bin."""
+
+    def __init__(self, bin_id: str, master_key: str,
+                 splice_appends: bool = False):
+        self.bin_id = bin_id
+        self.master_key = master_key
+        # опциональный fast-path: при добавлении одной задачи вклеивать
+        # её в закодированное тело прошлого PUT вместо полной сериализации;
+        # _splice_at — записанное при кодировании смещение закрывающей ']'
+        # массива tasks (None, если вклейка в это тело невозможна)
+        self.splice_appends = splice_appends
+        self._last_encoded: bytes | None = None
+        self._splice_at: int | None = None
+        # условный GET: помним ETag и тело последнего ответа,
+        # чтобы на 304 не скачивать bin заново
+        self._etag: str | None = None
+        self._cached_body: bytes | None = None
+        # токены не меняются после создания клиента —
+        # собираем заголовки один раз
+        self._auth_headers = {"X-Master-Key": master_key,
+                              "Content-Type": "application/json"}
+        super().__init__("https://api.jsonbin.io/v3")
+
+    def auth_headers(self) -> dict:
+        return self._auth_headers
+
+    async def fetch_payload(self, lazy: bool = False):
+        """Скачать содержимое bin.
+
+        При lazy=True возвращает «ленивый» simdjson-документ: поля
+        декодируются только при обращении, без материализации всего dict.
+        Подходит только для чтения; для мутаций нужен обычный dict.
+        """
+        headers = {"If-None-Match": self._etag} if self._etag else None
+        resp = await self.request("GET", f"/b/{self.bin_id}/latest",
+                                  expected=(200, 304), headers=headers)
+        if resp.status_code == 304:
+            body = self._cached_body
+        else:
+            self._etag = resp.headers.get("ETag")
+            self._cached_body = body = resp.content
+        if lazy:
+            return _parser.parse(body)["record"]
+        return orjson.loads(body)["record"]
+
+    async def push_payload(self, payload: dict,
+                           appended: dict | None = None) -> None:
+        """Залить payload в bin.
+
+        Если payload отличается от прошлого PUT только добавленной в конец
+        задачей, caller может передать её в appended: при включённом
+        splice_appends она вклеивается в прошлое закодированное тело за
+        O(1) вместо повторной сериализации всего списка.
+
+        Вклейка предполагает, что bin пишет только этот процесс: тело
+        собирается из нашего прошлого PUT, поэтому чужая запись между
+        двумя push будет молча перезатёрта. Если bin доступен другим
+        писателям, оставляйте splice_appends выключенным.
+        """
+        body = None
+        if (self.splice_appends and appended is not None
+                and self._last_encoded is not None
+                and self._splice_at is not None):
+            buf, at = self._last_encoded, self._splice_at
+            sep = b"" if buf[at - 1:at] == b"[" else b","
+            body = buf[:at] + sep + orjson.dumps(appended) + buf[at:]
+            # хвост после ']' не изменился — сдвигаем смещение на его длину
+            self._splice_at = len(body) - (len(buf) - at)
+        if body is None:
+            body = orjson.dumps(payload)
+            # вклеивать безопасно, только если tasks — последний ключ
+            # payload: тогда тело кончается его закрывающей ']' и '}'
+            if next(reversed(payload), None) == "tasks" \
+                    and body.endswith(b"]}"):
+                self._splice_at = len(body) - 2
+            else:
+                self._splice_at = None
+        resp = await self.request("PUT", f"/b/{self.bin_id}", content=body)
+        self._last_encoded = body
+        # jsonbin возвращает обновлённый record в ответе PUT:
+        # обновляем кеш, чтобы следующий fetch_payload обошёлся без скачивания
+        self._etag = resp.headers.get("ETag")
+        self._cached_body = resp.content if self._etag else None
+
+
+class CloudflareAIClient(BaseHTTPClient):
+    """Клиент Cloudflare Workers AI (урок 3)."""
+
+    MODEL = "@cf/meta/llama-3-8b-instruct"
+
+    def __init__(self, account_id: str, api_token: str):
+        self.account_id = account_id
+        self.api_token = api_token
+        self._auth_headers = {"Authorization": f"Bearer {api_token}"}
+        super().__init__("https://api.cloudflare.com/client/v4")
+
+    def auth_headers(self) -> dict:
+        return self._auth_headers
+
+    async def generate_plan(self, prompt: str) -> str:
+        resp = await self.request(
+            "POST",
+            f"/accounts/{self.account_id}/ai/run/{self.MODEL}",
+            json={"messages": [{"role": "user", "content": prompt}]},
+        )
+        return self.json(resp)["result"]["response"]
+
+
+class RemoteTaskStore:
+    """Stateless-хранение задач во внешнем сервисе jsonbin.io."""
+
+    def __init__(self, jsonbin: JsonBinClient):
+        self.jsonbin = jsonbin
+        # внутри batch() мутации накапливаются здесь и уходят одним PUT
+        self._pending: dict | None = None
+
+    async def _load_payload(self) -> dict:
+        if self._pending is not None:
+            return self._pending
+        return await self.jsonbin.fetch_payload()
+
+    async def _store_payload(self, payload: dict,
+                             appended: dict | None = None) -> None:
+        if self._pending is None:
+            await self.jsonbin.push_payload(payload, appended=appended)
+
+    async def flush(self) -> None:
+        """Отправить накопленный в batch() payload одним PUT."""
+        if self._pending is not None:
+            await self.jsonbin.push_payload(self._pending)
+
+    @asynccontextmanager
+    async def batch(self):
+        """Объединить серию мутаций в один fetch и один push."""
+        self._pending = await self.jsonbin.fetch_payload()
+        try:
+            yield self
+            await self.flush()
+        finally:
+            self._pending = None
+
+    async def get_all(self) -> list[Task]:
+        if self._pending is not None:
+            return [Task.from_raw(item) for item in self._pending["tasks"]]
+        # чтение без мутаций: вытаскиваем только нужные поля
+        # из ленивого документа, не разбирая весь payload
+        payload = await self.jsonbin.fetch_payload(lazy=True)
+        return [Task.from_raw(item) for item in payload["tasks"]]
+
+    async def create_task(self, title: str) -> Task:
+        payload = await self._load_payload()
+        tasks_raw = payload["tasks"]
+        next_id = max((int(item["id"]) for item in tasks_raw), default=0) + 1
+        task = Task(next_id, title)
+        raw = task.to_dict()
+        tasks_raw.append(raw)
+        await self._store_payload(payload, appended=raw)
+        return task
+
+    async def update_task(self, id: int, title: str | None = None,
+                          status: TaskStatus | None = None,
+                          notes: str | None = None) -> Task:
+        payload = await self._load_payload()
+        tasks_raw = payload["tasks"]
+        idx = {int(item["id"]): i for i, item in enumerate(tasks_raw)}
+        i = idx.get(id)
+        if i is None:
+            raise TaskNotFoundError("Задача не найдена")
+        task = Task.from_raw(tasks_raw[i])
+        if title is not None:
+            task.rename_title(title)
+        if status is not None:
+            task.change_status(status)
+        if notes is not None:
+            task.add_notes(notes)
+        tasks_raw[i] = task.to_dict()
+        await self._store_payload(payload)
+        return task
+
+    async def delete_task(self, id: int) -> None:
+        payload = await self._load_payload()
+        tasks_raw = payload["tasks"]
+        idx = {int(item["id"]): i for i, item in enumerate(tasks_raw)}
+        i = idx.get(id)
+        if i is None:
+            raise TaskNotFoundError("Задача не найдена")
+        tasks_raw.pop(i)
+        await self._store_payload(payload)
+
+
+class TaskService:
+    """Связывает хранилище задач и LLM: создаёт задачу и добавляет план решения."""
+
+    def __init__(self, store: RemoteTaskStore, ai: CloudflareAIClient):
+        self.store = store
+        self.ai = ai
+
+    @staticmethod
+    def _build_prompt(title: str) -> str:
+        return (f"Объясни кратко, как решить задачу: \"{title}\". "
+                "Ответь пронумерованным списком шагов.")
+
+    async def create_task_and_enrich(self, title: str) -> Task:
+        # LLM-запрос зависит только от названия задачи, поэтому
+        # выполняем его параллельно со скачиванием bin и пишем
+        # задачу сразу с планом — один PUT вместо двух циклов fetch+push
+        payload, plan = await asyncio.gather(
+            self.store.jsonbin.fetch_payload(),
+            self.ai.generate_plan(self._build_prompt(title)),
+        )
+        tasks_raw = payload["tasks"]
+        next_id = max((int(item["id"]) for item in tasks_raw), default=0) + 1
+        task = Task(next_id, title, notes=plan)
+        raw = task.to_dict()
+        tasks_raw.append(raw)
+        await self.store.jsonbin.push_payload(payload, appended=raw)
+        return task
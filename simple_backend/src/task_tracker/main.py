@@ -1,19 +1,82 @@
-from fastapi import FastAPI
+import os
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from classes import (BaseHTTPClient, CloudflareAIClient, JsonBinClient,
+                     RemoteTaskStore, Task, TaskNotFoundError, TaskService,
+                     TaskStatus)
+
+app = FastAPI(title="Task tracker", default_response_class=ORJSONResponse)
+
+jsonbin = JsonBinClient(os.getenv("JSONBIN_BIN_ID", ""),
+                        os.getenv("JSONBIN_MASTER_KEY", ""))
+cloudflare = CloudflareAIClient(os.getenv("CLOUDFLARE_ACCOUNT_ID", ""),
+                                os.getenv("CLOUDFLARE_API_TOKEN", ""))
+store = RemoteTaskStore(jsonbin)
+service = TaskService(store, cloudflare)
+
+
+class TaskCreate(BaseModel):
+    title: str
+
+
+class TaskUpdate(BaseModel):
+    title: str | None = None
+    status: TaskStatus | None = None
+
+
+def task_out(task: Task) -> dict:
+    # отдаём обычный dict: без прогонки через pydantic-модель
+    # ответ сериализуется orjson-ом за один проход
+    return {"id": task.id, "title": task.title,
+            "status": task.status.value, "notes": task.notes}
 
-app = FastAPI()
 
 @app.get("/tasks")
-def get_tasks():
-    pass
+async def get_tasks():
+    # готовый ORJSONResponse минует и jsonable_encoder FastAPI
+    return ORJSONResponse([task_out(task) for task in await store.get_all()])
+
 
 @app.post("/tasks")
-def create_task(task):
-    pass
+async def create_task(task: TaskCreate):
+    try:
+        created = await service.create_task_and_enrich(task.title)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return task_out(created)
+
 
 @app.put("/tasks/{task_id}")
-def update_task(task_id: int):
-    pass
+async def update_task(task_id: int, task: TaskUpdate):
+    try:
+        updated = await store.update_task(task_id, title=task.title,
+                                          status=task.status)
+    except TaskNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        # задача есть, но новые значения полей не прошли валидацию
+        raise HTTPException(status_code=422, detail=str(e))
+    return task_out(updated)
+
 
 @app.delete("/tasks/{task_id}")
-def delete_task(task_id: int):
-    pass
+async def delete_task(task_id: int):
+    try:
+        await store.delete_task(task_id)
+    except TaskNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"ok": True}
+
+
+@app.on_event("startup")
+def startup():
+    # общий пул соединений для всех внешних клиентов
+    BaseHTTPClient.open_client()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await BaseHTTPClient.close_client()